@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the Checkmarx One CLI (cx) used by the offline benchmarks.
+
+Accepts the commands scan_automation_cli.py runs, prints output shaped like
+the real CLI, and appends each invocation to CX_STUB_LOG if set.
+CX_STUB_DELAY sets the seconds a scan submission takes (default: 0.2).
+Scans show as Running for CX_STUB_SCAN_SECONDS after submission (default: 1)
+and Completed after that; "scan list" finds them in CX_STUB_LOG.
+"""
+
+import json
+import os
+import sys
+import time
+import uuid
+
+def log(log_path, record):
+    if log_path:
+        with open(log_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(dict(record, time=time.time())) + "\n")
+
+def list_scans(log_path, filters):
+    """Scans created so far, as "scan list --format json" returns them"""
+    wanted = None
+    for part in filters.split(','):
+        key, _, value = part.partition('=')
+        if key == 'scan-ids':
+            wanted = set(value.split(';'))
+    scans = []
+    if log_path and os.path.exists(log_path):
+        with open(log_path, encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                if 'scan_id' not in record or (wanted is not None and record['scan_id'] not in wanted):
+                    continue
+                done = time.time() - record['time'] >= float(os.environ.get("CX_STUB_SCAN_SECONDS", "1"))
+                scans.append({"ID": record['scan_id'], "ProjectName": record['project'],
+                              "Status": "Completed" if done else "Running"})
+    return scans
+
+def main():
+    args = sys.argv[1:]
+    log_path = os.environ.get("CX_STUB_LOG")
+    log(log_path, {"args": args})
+
+    if args[:2] == ["auth", "validate"]:
+        print("Successfully authenticated to AST server!")
+        return 0
+
+    if args[:2] == ["scan", "create"]:
+        time.sleep(float(os.environ.get("CX_STUB_DELAY", "0.2")))
+        source = args[args.index("-s") + 1] if "-s" in args else None
+        if not source or not os.path.exists(source):
+            print(f"Error: source {source} not found", file=sys.stderr)
+            return 1
+        scan_id = str(uuid.uuid4())
+        project = args[args.index("--project-name") + 1] if "--project-name" in args else None
+        log(log_path, {"scan_id": scan_id, "project": project})
+        print(f"Scan ID : {scan_id}")
+        print("Status : Queued")
+        return 0
+
+    if args[:2] == ["scan", "list"]:
+        filters = args[args.index("--filter") + 1] if "--filter" in args else ""
+        print(json.dumps(list_scans(log_path, filters)))
+        return 0
+
+    print(f"Error: unsupported command {' '.join(args[:2])}", file=sys.stderr)
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
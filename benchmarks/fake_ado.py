@@ -0,0 +1,225 @@
+"""
+Local stand-in for the Azure DevOps Server REST endpoints used by
+scan_automation_cli.py, for offline benchmarks.
+
+Implements project listing (continuation tokens and ETags), TFVC item
+listing (Full and OneLevel, JSON or $format=zip), single file downloads,
+itembatch and the latest changeset query. File contents are generated on
+the fly from a seed, so large trees don't have to fit in memory.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+import zipfile
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# Incompressible pattern that file contents are cut from
+BLOCK_SIZE = 1024 * 1024
+_block = random.Random(0).randbytes(BLOCK_SIZE) if hasattr(random.Random, 'randbytes') else \
+    bytes(random.Random(0).getrandbits(8) for _ in range(BLOCK_SIZE))
+
+class FakeFile:
+    """File content of a given size, generated deterministically from a seed"""
+
+    __slots__ = ('size', 'seed', '_hash')
+
+    def __init__(self, size, seed):
+        self.size = size
+        self.seed = seed
+        self._hash = None
+
+    def chunks(self, chunk_size=256 * 1024):
+        start = (self.seed * 7919) % BLOCK_SIZE
+        remaining = self.size
+        while remaining > 0:
+            length = min(chunk_size, remaining, BLOCK_SIZE - start)
+            yield _block[start:start + length]
+            remaining -= length
+            start = (start + length) % BLOCK_SIZE
+
+    def read(self):
+        return b"".join(self.chunks())
+
+    @property
+    def hash_value(self):
+        """Base64 MD5 of the content, as TFVC reports it in hashValue"""
+        if self._hash is None:
+            md5 = hashlib.md5()
+            for chunk in self.chunks():
+                md5.update(chunk)
+            self._hash = base64.b64encode(md5.digest()).decode()
+        return self._hash
+
+class FakeCollection:
+    """Projects of a fake collection: {project: {relative path: FakeFile}}"""
+
+    def __init__(self, projects, changeset=100):
+        self.projects = projects
+        self.changeset = changeset
+
+    def items(self, project):
+        """All items of a project in path order, as the items API returns them"""
+        files = self.projects[project]
+        folders = set()
+        for path in files:
+            parts = path.split('/')[:-1]
+            for i in range(1, len(parts) + 1):
+                folders.add('/'.join(parts[:i]))
+
+        items = [{"path": f"$/{project}", "isFolder": True, "version": self.changeset}]
+        items.extend({"path": f"$/{project}/{folder}", "isFolder": True, "version": self.changeset}
+                     for folder in folders)
+        items.extend({"path": f"$/{project}/{path}", "size": fake_file.size, "version": self.changeset,
+                      "hashValue": fake_file.hash_value} for path, fake_file in files.items())
+        items.sort(key=lambda item: item['path'].lower())
+        return items
+
+def make_collection(projects=1, files=100, size=lambda rnd: 4096, folders=10, seed=1):
+    """Build a collection; size(rnd) draws the size of each file"""
+    rnd = random.Random(seed)
+    collection = {}
+    for p in range(projects):
+        collection[f"Project{p:03d}"] = {
+            f"src/module{i % folders}/file{i}.txt": FakeFile(size(rnd), rnd.getrandbits(32))
+            for i in range(files)
+        }
+    return FakeCollection(collection)
+
+class FakeAdoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeADO/1.0"
+    # Headers and body are separate writes; without this, delayed ACKs add ~40ms per request
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, code, body, content_type="application/json", extra_headers=None):
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (extra_headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data, extra_headers=None):
+        body = json.dumps(data).encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            for key, value in (extra_headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            return
+        self.send_body(200, body, extra_headers=dict(extra_headers or {}, ETag=etag))
+
+    def send_zip(self, entries):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zipf:
+            for name, fake_file in entries:
+                with zipf.open(name, 'w', force_zip64=fake_file.size > 0x7FFFFFFF) as f:
+                    for chunk in fake_file.chunks():
+                        f.write(chunk)
+        self.send_body(200, buffer.getvalue(), "application/zip")
+
+    def simulate_latency(self):
+        server = self.server
+        with server.stats_lock:
+            server.stats['requests'] += 1
+        if server.latency:
+            time.sleep(server.latency)
+
+    def do_GET(self):
+        self.simulate_latency()
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        collection = self.server.collection
+        parts = url.path.strip('/').split('/')
+
+        if url.path.endswith('/_apis/projects'):
+            names = sorted(collection.projects)
+            top = int(query.get('$top', 100))
+            start = int(query.get('continuationToken', 0) or 0)
+            page = names[start:start + top]
+            extra = {"x-ms-continuationtoken": str(start + top)} if start + top < len(names) else {}
+            self.send_json({"count": len(page), "value": [
+                {"id": name, "name": name, "revision": 1, "lastUpdateTime": "2024-01-01T00:00:00Z"}
+                for name in page]}, extra)
+            return
+
+        if len(parts) < 2 or parts[1] not in collection.projects:
+            self.send_body(404, b'{"message": "project not found"}')
+            return
+        project = parts[1]
+
+        if url.path.endswith('/_apis/tfvc/changesets'):
+            self.send_json({"count": 1, "value": [{"changesetId": collection.changeset}]})
+            return
+
+        if not url.path.endswith('/_apis/tfvc/items'):
+            self.send_body(404, b'{}')
+            return
+
+        if 'scopePath' in query:
+            scope = query['scopePath'].rstrip('/')
+            if query.get('$format') == 'zip':
+                self.send_zip([(f"{project}/{path}", fake_file)
+                               for path, fake_file in sorted(collection.projects[project].items())])
+                return
+            items = collection.items(project)
+            if query.get('recursionLevel') == 'OneLevel':
+                prefix = scope.lower() + '/'
+                items = [item for item in items if item['path'].lower() == scope.lower() or (
+                    item['path'].lower().startswith(prefix) and '/' not in item['path'][len(prefix):])]
+            self.send_json({"count": len(items), "value": items})
+            return
+
+        fake_file = collection.projects[project].get(query.get('path', '')[len(f"$/{project}/"):])
+        if fake_file is None:
+            self.send_body(404, b'{}')
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(fake_file.size))
+        self.end_headers()
+        for chunk in fake_file.chunks():
+            self.wfile.write(chunk)
+
+    def do_POST(self):
+        self.simulate_latency()
+        url = urlparse(self.path)
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        collection = self.server.collection
+        project = url.path.strip('/').split('/')[1]
+        if not url.path.endswith('/_apis/tfvc/itembatch') or project not in collection.projects:
+            self.send_body(404, b'{}')
+            return
+
+        files = collection.projects[project]
+        entries = []
+        for descriptor in body.get('itemDescriptors', []):
+            path = descriptor['path'][len(f"$/{project}/"):]
+            if path in files:
+                entries.append((descriptor['path'].lstrip('$/'), files[path]))
+        self.send_zip(entries)
+
+def serve(collection, port=0, latency=0.0):
+    """Start the fake server in a daemon thread; returns the server (base URL in server.base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeAdoHandler)
+    server.daemon_threads = True
+    server.collection = collection
+    server.latency = latency
+    server.stats = {'requests': 0}
+    server.stats_lock = threading.Lock()
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}/DefaultCollection"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
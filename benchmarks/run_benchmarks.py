@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmarks for scan_automation_cli.py.
+
+Each scenario starts a fake Azure DevOps server (fake_ado.py), creates
+local bare Git repositories and points CX_CLI_PATH at a stub cx
+(cx_stub.py). The TFVC download, Git clone and scan stages then run, each
+in its own child process, and files/s, MB/s, wall time and peak RSS are
+reported for every stage.
+
+Examples:
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --scenario small-files --fetch-mode batch
+  python benchmarks/run_benchmarks.py --scale 0.1 --json results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCHMARK_DIR)
+sys.path.insert(0, BENCHMARK_DIR)
+
+import fake_ado
+
+MB = 1024 * 1024
+STAGES = ["tfvc", "git", "scan"]
+
+# Each scenario: TFVC collection shape, server latency, and Git repos as
+# (repo count, files per repo, size function)
+SCENARIOS = {
+    "small-files": {
+        "description": "One project with thousands of small files",
+        "projects": 1, "files": 5000, "size": lambda rnd: rnd.randint(512, 8 * 1024),
+        "latency": 0.002,
+        "git": (4, 500, lambda rnd: rnd.randint(512, 8 * 1024)),
+    },
+    "huge-files": {
+        "description": "A few very large files",
+        "projects": 1, "files": 4, "size": lambda rnd: 64 * MB,
+        "latency": 0.0,
+        "git": (1, 2, lambda rnd: 16 * MB),
+    },
+    "many-projects": {
+        "description": "Many projects with a few dozen files each",
+        "projects": 50, "files": 40, "size": lambda rnd: int(min(rnd.lognormvariate(8.3, 1.0), 512 * 1024)),
+        "latency": 0.002,
+        "git": (12, 50, lambda rnd: int(min(rnd.lognormvariate(8.3, 1.0), 512 * 1024))),
+    },
+}
+
+def get_peak_rss():
+    """Peak RSS in bytes of this process and of its largest waited-for child, or None without resource"""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit)
+
+def create_git_remotes(root, repos, files, size, seed=2):
+    """Create bare repositories under root; returns their file:// URLs"""
+    rnd = random.Random(seed)
+    env = dict(os.environ, GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.com",
+               GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.com")
+    urls = []
+    for r in range(repos):
+        name = f"repo{r:03d}"
+        work_dir = os.path.join(root, "work", name)
+        bare_dir = os.path.join(root, f"{name}.git")
+        os.makedirs(work_dir)
+        for i in range(files):
+            path = os.path.join(work_dir, "src", f"module{i % 10}", f"file{i}.txt")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                for chunk in fake_ado.FakeFile(size(rnd), rnd.getrandbits(32)).chunks():
+                    f.write(chunk)
+        for cmd in [["git", "init", "-q", "-b", "main"], ["git", "add", "-A"],
+                    ["git", "commit", "-q", "-m", "Benchmark content"]]:
+            subprocess.run(cmd, cwd=work_dir, env=env, check=True, capture_output=True)
+        subprocess.run(["git", "clone", "-q", "--bare", work_dir, bare_dir], check=True, capture_output=True)
+        shutil.rmtree(work_dir)
+        urls.append("file://" + bare_dir.replace(os.sep, '/'))
+    return urls
+
+def create_cx_wrapper(root):
+    """Create an executable that runs cx_stub.py with this Python, usable as CX_CLI_PATH"""
+    stub = os.path.join(BENCHMARK_DIR, "cx_stub.py")
+    if os.name == 'nt':
+        path = os.path.join(root, "cx.cmd")
+        with open(path, 'w') as f:
+            f.write(f'@"{sys.executable}" "{stub}" %*\n')
+    else:
+        path = os.path.join(root, "cx")
+        with open(path, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{stub}" "$@"\n')
+        os.chmod(path, 0o755)
+    return path
+
+def count_tree(path, skip_dirs=(".git",)):
+    """Count files and bytes under path"""
+    files = 0
+    total = 0
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if d not in skip_dirs]
+        for name in names:
+            files += 1
+            total += os.path.getsize(os.path.join(root, name))
+    return files, total
+
+def run_stage(stage, options):
+    """Run one stage in this (child) process and return its measurements"""
+    import logging
+    import zipfile
+
+    os.chdir(options.workdir)
+    sys.path.insert(0, REPO_ROOT)
+    import scan_automation_cli as cli
+
+    cli.logger = cli.setup_logging(logging.WARNING)
+    cli.BASE_URL = options.base_url
+    cli.TFVC_FETCH_MODE = options.fetch_mode
+    cli.TFVC_WORKERS = options.tfvc_workers
+    cli.TFVC_FULL_SYNC = True
+    cli.TFVC_BLOB_CACHE_MAX_BYTES = 0
+    cli.GIT_WORKERS = options.git_workers
+    cli.GIT_ARTIFACT_MODE = options.git_artifact
+    cli.CX_CLI_PATH = options.cx
+    cli.SCAN_RATE_PER_MINUTE = 0
+    cli.FORCE_SCAN = True
+
+    start = time.time()
+    if stage == "tfvc":
+        ok = cli.download_all_tfvc_projects()
+    elif stage == "git":
+        ok = cli.download_all_git_repos(options.repos_file)
+    else:
+        ok = cli.scan_all_projects()
+    wall = time.time() - start
+
+    files = 0
+    total = 0
+    if stage == "tfvc" or (stage == "git" and options.git_artifact == "zip"):
+        output_dir = cli.OUTPUT_DIR if stage == "tfvc" else cli.GIT_OUTPUT_DIR
+        for name in os.listdir(output_dir):
+            if name.endswith(".zip"):
+                with zipfile.ZipFile(os.path.join(output_dir, name)) as zipf:
+                    infos = [info for info in zipf.infolist() if not info.is_dir()]
+                files += len(infos)
+                total += sum(info.file_size for info in infos)
+    elif stage == "git":
+        files, total = count_tree(cli.GIT_OUTPUT_DIR)
+    else:
+        with open(os.environ["CX_STUB_LOG"], encoding='utf-8') as f:
+            files = sum(1 for line in f if '"create"' in line)
+        total = sum(os.path.getsize(os.path.join(cli.OUTPUT_DIR, name)) for name in os.listdir(cli.OUTPUT_DIR))
+
+    peak_rss, peak_child_rss = get_peak_rss()
+    return {"ok": ok, "files": files, "bytes": total, "wall": wall,
+            "peak_rss": peak_rss, "peak_child_rss": peak_child_rss}
+
+def run_stage_process(stage, options, base_url, repos_file, cx, workdir, env):
+    cmd = [sys.executable, os.path.abspath(__file__), "--child", stage, "--workdir", workdir,
+           "--base-url", base_url, "--repos-file", repos_file, "--cx", cx,
+           "--fetch-mode", options.fetch_mode, "--tfvc-workers", str(options.tfvc_workers),
+           "--git-workers", str(options.git_workers), "--git-artifact", options.git_artifact]
+    result = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(f"{stage} stage failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def run_scenario(name, options):
+    scenario = SCENARIOS[name]
+    root = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        files = max(1, int(scenario["files"] * options.scale))
+        collection = fake_ado.make_collection(scenario["projects"], files, scenario["size"])
+        repos, repo_files, repo_size = scenario["git"]
+        urls = create_git_remotes(os.path.join(root, "remotes"), repos, max(1, int(repo_files * options.scale)),
+                                  repo_size)
+        repos_file = os.path.join(root, "git-repos.txt")
+        with open(repos_file, 'w') as f:
+            f.write("\n".join(urls) + "\n")
+        cx = create_cx_wrapper(root)
+        workdir = os.path.join(root, "run")
+        os.makedirs(workdir)
+        env = dict(os.environ, CX_STUB_LOG=os.path.join(root, "cx.log"), CX_STUB_DELAY=str(options.scan_delay))
+
+        server = fake_ado.serve(collection, latency=scenario["latency"])
+        try:
+            results = []
+            for stage in options.stages:
+                measurement = run_stage_process(stage, options, server.base_url, repos_file, cx, workdir, env)
+                measurement.update(scenario=name, stage=stage)
+                results.append(measurement)
+                print_result(measurement)
+            return results
+        finally:
+            server.shutdown()
+    finally:
+        if options.keep:
+            print(f"Kept benchmark files in {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+def format_rss(value):
+    return f"{value / MB:.0f} MB" if value is not None else "n/a"
+
+def print_header():
+    print(f"{'scenario':<15} {'stage':<6} {'files':>7} {'MB':>9} {'wall s':>8} {'files/s':>9} {'MB/s':>8} "
+          f"{'peak RSS':>9} {'children':>9}")
+
+def print_result(r):
+    wall = max(r['wall'], 1e-9)
+    status = "" if r['ok'] else "  (failed)"
+    print(f"{r['scenario']:<15} {r['stage']:<6} {r['files']:>7} {r['bytes'] / MB:>9.1f} {r['wall']:>8.2f} "
+          f"{r['files'] / wall:>9.1f} {r['bytes'] / MB / wall:>8.1f} {format_rss(r['peak_rss']):>9} "
+          f"{format_rss(r['peak_child_rss']):>9}{status}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline throughput benchmarks for scan_automation_cli.py",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog="Scenarios:\n" + "\n".join(
+                                         f"  {name:<15} {s['description']}" for name, s in SCENARIOS.items()))
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('--stage', dest='stages', action='append', choices=STAGES,
+                        help='Stage to run (repeatable, default: all)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Multiply the number of files per project and repo (default: 1.0)')
+    parser.add_argument('--fetch-mode', default="per-file", choices=["per-file", "batch", "server-zip"],
+                        help='TFVC fetch mode to benchmark (default: per-file)')
+    parser.add_argument('--git-artifact', default="worktree", choices=["worktree", "zip"],
+                        help='Git scan artifact to benchmark (default: worktree)')
+    parser.add_argument('--tfvc-workers', type=int, default=8)
+    parser.add_argument('--git-workers', type=int, default=4)
+    parser.add_argument('--scan-delay', type=float, default=0.2,
+                        help='Seconds the stub cx takes per scan submission (default: 0.2)')
+    parser.add_argument('--json', metavar='FILE', help='Also write the results as JSON')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated files for inspection')
+    parser.add_argument('--child', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    parser.add_argument('--repos-file', help=argparse.SUPPRESS)
+    parser.add_argument('--cx', help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.child:
+        print(json.dumps(run_stage(options.child, options)))
+        return 0
+
+    options.stages = options.stages or STAGES
+    if "scan" in options.stages and "tfvc" not in options.stages and "git" not in options.stages:
+        parser.error("the scan stage needs the tfvc or git stage to produce something to scan")
+
+    print_header()
+    results = []
+    for name in options.scenario or list(SCENARIOS):
+        results.extend(run_scenario(name, options))
+
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0 if all(r['ok'] for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
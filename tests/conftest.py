@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# scan_automation_cli creates its log, run and download directories in the
+# working directory on import, so the tests run from a scratch directory
+os.chdir(tempfile.mkdtemp(prefix='scan-automation-tests-'))
@@ -0,0 +1,60 @@
+import base64
+import hashlib
+import io
+import os
+
+import scan_automation_cli as cli
+
+
+def hash_value(data):
+    return base64.b64encode(hashlib.md5(data).digest()).decode()
+
+
+def put(cache, data):
+    assert cache.put(hash_value(data), io.BytesIO(data))
+    return cache.key_for(hash_value(data))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = cli.BlobCache(str(tmp_path), 250)
+    first = put(cache, b"a" * 100)
+    second = put(cache, b"b" * 100)
+    cache.open(hash_value(b"a" * 100)).close()
+    put(cache, b"c" * 100)
+
+    assert first in cache.entries
+    assert second not in cache.entries
+    assert not os.path.exists(cache.path_for(second))
+    assert cache.total_bytes == 200
+
+
+def test_blob_that_cannot_be_deleted_stays_counted(tmp_path, monkeypatch):
+    cache = cli.BlobCache(str(tmp_path), 250)
+    busy = put(cache, b"a" * 100)
+    other = put(cache, b"b" * 100)
+    remove = os.remove
+
+    def remove_unless_busy(path):
+        if path == cache.path_for(busy):
+            raise PermissionError(13, "The process cannot access the file", path)
+        remove(path)
+
+    monkeypatch.setattr(os, "remove", remove_unless_busy)
+    put(cache, b"c" * 100)
+    assert busy in cache.entries
+    assert other not in cache.entries
+    assert cache.total_bytes == sum(os.path.getsize(cache.path_for(key)) for key in cache.entries)
+
+    # Once the blob is closed, the next pass deletes it first
+    monkeypatch.setattr(os, "remove", remove)
+    put(cache, b"d" * 100)
+    assert busy not in cache.entries
+    assert not os.path.exists(cache.path_for(busy))
+    assert cache.total_bytes == 200
+
+
+def test_rejects_content_that_does_not_match_its_hash(tmp_path):
+    cache = cli.BlobCache(str(tmp_path), 1000)
+    assert not cache.put(hash_value(b"expected"), io.BytesIO(b"something else"))
+    assert cache.total_bytes == 0
+    assert not cache.contains(hash_value(b"expected"))
@@ -0,0 +1,99 @@
+import os
+import time
+
+import pytest
+
+import scan_automation_cli as cli
+
+
+@pytest.fixture
+def lease_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "SHARD_LEASE_DIR", str(tmp_path))
+    monkeypatch.setattr(cli, "SHARD_NODE_ID", "node-a")
+    yield tmp_path
+    cli.finish_leases()
+
+
+def as_node(monkeypatch, node):
+    monkeypatch.setattr(cli, "SHARD_NODE_ID", node)
+
+
+def lease_of(name, kind='tfvc'):
+    return cli.read_lease(cli.get_lease_path(f"{kind}:{name.lower()}"))
+
+
+def age_lease(name, seconds, kind='tfvc'):
+    path = cli.get_lease_path(f"{kind}:{name.lower()}")
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+def test_live_lease_is_not_claimed_twice(lease_dir, monkeypatch):
+    assert cli.claim_job('tfvc', 'Project')
+    as_node(monkeypatch, "node-b")
+    assert not cli.claim_job('tfvc', 'Project')
+    assert not cli.owns_job('tfvc', 'Project')
+    as_node(monkeypatch, "node-a")
+    assert cli.owns_job('tfvc', 'Project')
+
+
+def test_restarted_node_keeps_its_lease(lease_dir):
+    assert cli.claim_job('tfvc', 'Project')
+    token = lease_of('Project')[0]['token']
+    cli.finish_leases()
+    assert cli.claim_job('tfvc', 'Project')
+    lease, _ = lease_of('Project')
+    assert lease['node'] == "node-a"
+    assert lease['state'] == "claimed"
+    assert lease['token'] == token
+
+
+def test_stale_lease_is_taken_over_after_expiry(lease_dir, monkeypatch):
+    assert cli.claim_job('tfvc', 'Project')
+    # node-a crashes: its heartbeat stops and the lease is left claimed
+    cli._lease_heartbeat_stop.set()
+    cli._held_leases.clear()
+    as_node(monkeypatch, "node-b")
+
+    age_lease('Project', cli.SHARD_LEASE_TTL - 60)
+    assert not cli.claim_job('tfvc', 'Project')
+
+    age_lease('Project', cli.SHARD_LEASE_TTL + 60)
+    assert cli.claim_job('tfvc', 'Project')
+    lease, age = lease_of('Project')
+    assert lease['node'] == "node-b"
+    assert age < 60
+    assert not [name for name in os.listdir(lease_dir) if name.endswith(('.expired', '.tmp'))]
+
+
+def test_done_lease_holds_until_its_longer_ttl(lease_dir, monkeypatch):
+    assert cli.claim_job('git', 'https://example.com/group/repo')
+    cli.finish_leases()
+    assert lease_of('https://example.com/group/repo', 'git')[0]['state'] == "done"
+    as_node(monkeypatch, "node-b")
+
+    age_lease('https://example.com/group/repo', cli.SHARD_LEASE_TTL + 60, 'git')
+    assert not cli.claim_job('git', 'https://example.com/group/repo')
+
+    age_lease('https://example.com/group/repo', cli.SHARD_LEASE_DONE_TTL + 60, 'git')
+    assert cli.claim_job('git', 'https://example.com/group/repo')
+
+
+def test_heartbeat_keeps_a_held_lease_from_expiring(lease_dir, monkeypatch):
+    monkeypatch.setattr(cli, "SHARD_LEASE_TTL", 0.4)
+    assert cli.claim_job('tfvc', 'Project')
+    time.sleep(1.0)
+    _, age = lease_of('Project')
+    assert age < 0.4
+
+    as_node(monkeypatch, "node-b")
+    assert not cli.claim_job('tfvc', 'Project')
+
+
+def test_heartbeat_recreates_a_removed_lease(lease_dir, monkeypatch):
+    monkeypatch.setattr(cli, "SHARD_LEASE_TTL", 0.4)
+    assert cli.claim_job('tfvc', 'Project')
+    os.remove(cli.get_lease_path("tfvc:project"))
+    time.sleep(0.5)
+    lease, _ = lease_of('Project')
+    assert lease is not None and lease['node'] == "node-a"
@@ -0,0 +1,95 @@
+import threading
+import time
+
+import scan_automation_cli as cli
+
+MB = 1024 * 1024
+
+
+def job(name, host='tfs', estimate=0):
+    return (('tfvc', name), f"tfvc:{name}", host, estimate)
+
+
+def test_prefers_hosts_with_fewer_downloads_in_flight():
+    scheduler = cli.PipelineScheduler([job('a1', 'a'), job('a2', 'a'), job('b1', 'b')])
+    assert scheduler.take()[0] == ('tfvc', 'a1')
+    assert scheduler.take()[0] == ('tfvc', 'b1')
+    assert scheduler.take()[0] == ('tfvc', 'a2')
+
+
+def test_budget_starts_largest_job_first():
+    scheduler = cli.PipelineScheduler([job('small', estimate=10 * MB), job('large', estimate=60 * MB),
+                                       job('medium', estimate=30 * MB)], limit=100 * MB)
+    assert [scheduler.take()[0][1] for _ in range(3)] == ['large', 'medium', 'small']
+    assert scheduler.used() == 100 * MB
+
+
+def test_waits_for_space_and_corrects_to_actual_size():
+    scheduler = cli.PipelineScheduler([job('first', estimate=80 * MB), job('second', estimate=50 * MB)],
+                                      limit=100 * MB)
+    _, key, host = scheduler.take()
+    assert scheduler.pick() is None
+    # The artifact came out smaller than estimated, which makes room
+    scheduler.finish(key, host, 40 * MB)
+    assert scheduler.pick() is not None
+    assert scheduler.take()[0] == ('tfvc', 'second')
+
+
+def test_job_larger_than_budget_runs_alone_without_deadlock():
+    jobs = [job('huge', estimate=250 * MB)] + [job(f'small{i}', estimate=40 * MB) for i in range(4)]
+    scheduler = cli.PipelineScheduler(jobs, limit=100 * MB)
+    lock = threading.Lock()
+    running = set()
+    overlapped_huge = []
+    done = []
+    remaining = [len(jobs)]
+
+    def worker():
+        while True:
+            # Each take() is for one job still pending, as in run_pipeline
+            with lock:
+                if not remaining[0]:
+                    return
+                remaining[0] -= 1
+            (_, name), key, host = scheduler.take()
+            with lock:
+                running.add(name)
+                if 'huge' in running and len(running) > 1:
+                    overlapped_huge.append(set(running))
+            time.sleep(0.01)
+            scheduler.finish(key, host, int(scheduler.reserved[key]))
+            with lock:
+                running.discard(name)
+                done.append(name)
+            scheduler.release(key)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert not any(thread.is_alive() for thread in threads), "scheduler deadlocked"
+    assert sorted(done) == sorted(name for (_, name), _, _, _ in jobs)
+    assert not overlapped_huge
+    assert scheduler.used() == 0
+
+
+def test_large_job_is_bypassed_at_most_disk_max_bypass_times(monkeypatch):
+    monkeypatch.setattr(cli, "DISK_MAX_BYPASS", 2)
+    jobs = [job('large', estimate=90 * MB)] + [job(f'small{i}', estimate=20 * MB) for i in range(5)]
+    scheduler = cli.PipelineScheduler(jobs, limit=100 * MB)
+    # Space held by an artifact still waiting for its scan
+    scheduler.reserved['tfvc:running'] = 50 * MB
+
+    first = scheduler.take()
+    second = scheduler.take()
+    assert first[0][1].startswith('small') and second[0][1].startswith('small')
+    assert scheduler.bypassed == {'tfvc:large': 2}
+
+    scheduler.release(first[1])
+    # A small job would fit, but the large one has waited long enough
+    assert scheduler.pick() is None
+
+    scheduler.release(second[1])
+    scheduler.release('tfvc:running')
+    assert scheduler.take()[0] == ('tfvc', 'large')
@@ -0,0 +1,92 @@
+import random
+import threading
+import time
+
+import ijson
+import pytest
+
+import scan_automation_cli as cli
+
+
+def test_stream_buffer_reads_while_writing():
+    body = cli.StreamBuffer()
+    chunks = [b'{"value": [', b'{"path": "$/P/a"},', b'{"path": "$/P/b"}', b']}']
+
+    def write():
+        for chunk in chunks:
+            body.write(chunk)
+        body.finish()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    items = [item['path'] for item in ijson.items(body, 'value.item')]
+    writer.join()
+    body.close()
+    assert items == ["$/P/a", "$/P/b"]
+
+
+def test_stream_buffer_spills_to_disk(monkeypatch):
+    monkeypatch.setattr(cli, "TFVC_SPOOL_MAX_BYTES", 16)
+    body = cli.StreamBuffer()
+    body.write(b"x" * 100)
+    body.finish()
+    assert body.read(40) == b"x" * 40
+    assert body.read() == b"x" * 60
+    assert body.read() == b""
+    body.close()
+
+
+def test_stream_buffer_raises_writer_error_after_data():
+    body = cli.StreamBuffer()
+    body.write(b"partial")
+    body.finish(OSError("connection reset"))
+    assert body.read() == b"partial"
+    with pytest.raises(OSError):
+        body.read()
+    body.close()
+
+
+def test_split_stream_keeps_order_and_reads_lazily():
+    pulled = []
+
+    def source():
+        for number in range(10):
+            pulled.append(number)
+            yield number
+
+    order, queues = cli.split_stream(source(), lambda n: 'even' if n % 2 == 0 else 'odd', ['even'])
+    evens = queues['even']
+    assert next(evens) == 0
+    assert pulled == [0]
+    assert next(evens) == 2
+    assert pulled == [0, 1, 2]
+    assert list(order) == [(('even' if n % 2 == 0 else 'odd'), n) for n in range(10)]
+    assert list(evens) == [4, 6, 8]
+
+
+def test_iter_in_order_keeps_input_order_and_reports_errors():
+    def work(number):
+        time.sleep(random.random() / 100)
+        if number == 3:
+            raise ValueError("bad item")
+        return number * 10
+
+    results = list(cli.iter_in_order(work, range(8), workers=4))
+    assert [item for item, _, _ in results] == list(range(8))
+    assert [result for _, result, _ in results] == [0, 10, 20, None, 40, 50, 60, 70]
+    assert isinstance(results[3][2], ValueError)
+
+
+def test_iter_in_order_bounds_work_ahead_of_consumer():
+    started = []
+
+    def work(number):
+        started.append(number)
+        return number
+
+    results = cli.iter_in_order(work, range(100), workers=2)
+    next(results)
+    time.sleep(0.05)
+    # At most 2 * workers calls are started ahead of what was consumed
+    assert len(started) <= 4
+    results.close()
@@ -0,0 +1,167 @@
+import io
+import os
+import sys
+import zipfile
+import zlib
+
+import pytest
+
+import scan_automation_cli as cli
+
+FILES = {
+    "src/Program.cs": b"class Program { static void Main() {} }\n" * 500,
+    "assets/logo.png": os.urandom(50000),
+    "empty.txt": b"",
+}
+
+
+@pytest.fixture(params=["raw", "fallback"])
+def write_mode(request, monkeypatch):
+    """Run a test with the raw writer and with the ZipFile.open() fallback"""
+    if request.param == "fallback":
+        monkeypatch.setattr(cli, "ZIP_RAW_WRITE_VERSIONS", ((2, 0), (2, 7)))
+    elif not cli.ZIP_RAW_WRITE_VERSIONS[0] <= sys.version_info[:2] <= cli.ZIP_RAW_WRITE_VERSIONS[1]:
+        pytest.skip("raw zip entries are not written on this Python version")
+    return request.param
+
+
+def write_zip(path, files):
+    with zipfile.ZipFile(path, 'w') as zipf:
+        for name, data in files.items():
+            entry = cli.compress_stream(io.BytesIO(data), name)
+            try:
+                cli.write_compressed_entry(zipf, name, entry)
+            finally:
+                entry.close()
+
+
+def test_raw_writer_matches_python_version(write_mode, tmp_path):
+    with zipfile.ZipFile(tmp_path / "a.zip", 'w') as zipf:
+        assert cli.can_write_raw_entries(zipf) == (write_mode == "raw")
+
+
+def test_precompressed_entries_round_trip(write_mode, tmp_path):
+    path = tmp_path / "project.zip"
+    write_zip(path, FILES)
+
+    with zipfile.ZipFile(path) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.namelist() == list(FILES)
+        for name, data in FILES.items():
+            assert zipf.read(name) == data
+        assert zipf.getinfo("src/Program.cs").compress_type == zipfile.ZIP_DEFLATED
+        assert zipf.getinfo("assets/logo.png").compress_type == zipfile.ZIP_STORED
+
+
+def test_writer_appends_after_entries_written_by_zipfile(write_mode, tmp_path):
+    path = tmp_path / "mixed.zip"
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        zipf.writestr("first.txt", b"written by zipfile")
+        entry = cli.compress_stream(io.BytesIO(b"precompressed" * 100), "second.txt")
+        cli.write_compressed_entry(zipf, "second.txt", entry)
+        zipf.writestr("third.txt", b"written by zipfile again")
+
+    with zipfile.ZipFile(path) as zipf:
+        assert zipf.testzip() is None
+        assert zipf.read("second.txt") == b"precompressed" * 100
+        assert zipf.read("third.txt") == b"written by zipfile again"
+
+
+def test_short_data_leaves_no_entry(write_mode, tmp_path):
+    data = b"some file content" * 100
+    compressed = zlib.compressobj(6, zlib.DEFLATED, -15)
+    payload = compressed.compress(data) + compressed.flush()
+
+    path = tmp_path / "short.zip"
+    with zipfile.ZipFile(path, 'w') as zipf:
+        with pytest.raises(zipfile.BadZipFile):
+            cli.write_precompressed_entry(zipf, "short.txt", io.BytesIO(payload[:-10]), zlib.crc32(data),
+                                          len(data), len(payload), zipfile.ZIP_DEFLATED)
+        if write_mode == "raw":
+            assert "short.txt" not in zipf.namelist()
+        zipf.writestr("next.txt", b"next")
+
+    with zipfile.ZipFile(path) as zipf:
+        assert zipf.read("next.txt") == b"next"
+
+
+def test_fallback_rejects_crc_mismatch(tmp_path):
+    data = b"content"
+    with zipfile.ZipFile(tmp_path / "crc.zip", 'w') as zipf:
+        zinfo = zipfile.ZipInfo("file.txt")
+        zinfo.compress_type = zipfile.ZIP_STORED
+        with pytest.raises(zipfile.BadZipFile):
+            cli.write_decompressed_entry(zipf, zinfo, io.BytesIO(data), zlib.crc32(data) ^ 1,
+                                         len(data), len(data))
+
+
+def test_copy_raw_zip_entry(write_mode, tmp_path):
+    source_path = tmp_path / "previous.zip"
+    write_zip(source_path, FILES)
+
+    target_path = tmp_path / "next.zip"
+    with zipfile.ZipFile(source_path) as source_zip, open(source_path, 'rb') as source_file:
+        with zipfile.ZipFile(target_path, 'w') as zipf:
+            for info in source_zip.infolist():
+                cli.copy_raw_zip_entry(zipf, info.filename, source_file, info)
+
+    with zipfile.ZipFile(target_path) as zipf:
+        assert zipf.testzip() is None
+        assert {name: zipf.read(name) for name in zipf.namelist()} == FILES
+
+
+def test_copy_raw_zip_entry_from_truncated_zip(tmp_path):
+    source_path = tmp_path / "previous.zip"
+    write_zip(source_path, FILES)
+    with zipfile.ZipFile(source_path) as source_zip:
+        info = source_zip.getinfo("assets/logo.png")
+    with open(source_path, 'r+b') as f:
+        f.truncate(info.header_offset + 100)
+
+    target_path = tmp_path / "next.zip"
+    with open(source_path, 'rb') as source_file, zipfile.ZipFile(target_path, 'w') as zipf:
+        with pytest.raises(zipfile.BadZipFile):
+            cli.copy_raw_zip_entry(zipf, info.filename, source_file, info)
+        assert zipf.namelist() == []
+
+    with zipfile.ZipFile(target_path) as zipf:
+        assert zipf.testzip() is None
+
+
+def test_recover_partial_zip_keeps_complete_entries(write_mode, tmp_path):
+    files = {f"src/file{i}.cs": (f"class C{i} {{}}\n" * (200 + i)).encode() for i in range(5)}
+    path = tmp_path / "project.zip.partial"
+    write_zip(path, files)
+    with zipfile.ZipFile(path) as zipf:
+        cut = zipf.getinfo("src/file3.cs")
+    # An interrupted run leaves no central directory and a half-written entry
+    with open(path, 'r+b') as f:
+        f.truncate(cut.header_offset + 40)
+
+    recovered = cli.recover_partial_zip(str(path))
+    assert list(recovered) == ["src/file0.cs", "src/file1.cs", "src/file2.cs"]
+
+    target_path = tmp_path / "project.zip"
+    with open(path, 'rb') as source_file, zipfile.ZipFile(target_path, 'w') as zipf:
+        for name, info in recovered.items():
+            cli.copy_raw_zip_entry(zipf, name, source_file, info)
+    with zipfile.ZipFile(target_path) as zipf:
+        assert zipf.testzip() is None
+        assert {name: zipf.read(name) for name in zipf.namelist()} == {
+            name: files[name] for name in recovered}
+
+
+def test_recover_partial_zip_cut_inside_a_header(tmp_path):
+    path = tmp_path / "project.zip.partial"
+    write_zip(path, {"a.txt": b"a" * 1000, "b.txt": b"b" * 1000})
+    with zipfile.ZipFile(path) as zipf:
+        cut = zipf.getinfo("b.txt")
+    with open(path, 'r+b') as f:
+        f.truncate(cut.header_offset + 10)
+    assert list(cli.recover_partial_zip(str(path))) == ["a.txt"]
+
+
+def test_recover_partial_zip_of_empty_file(tmp_path):
+    path = tmp_path / "project.zip.partial"
+    path.write_bytes(b"")
+    assert cli.recover_partial_zip(str(path)) == {}